@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+
+import streamlit as st
+
+from app_Compound_Triage.workflow import TRIAGE_STEPS, build_triage_workflow
+from ingestion import (  # type: ignore
+    WORKSPACE,
+    clean_workspace,
+    ingest,
+    touch_workspace,
+)
+from tool_registry import tools  # type: ignore
+
+
+def main():
+    st.title("Compound Triage")
+
+    st.markdown(
+        """
+        Runs SMILES Explorer, then logP (→ LLE), logD, pKa, Nearest
+        Neighbours and Scaffold Graph over one compound list. Only the step
+        you view is computed, and results are reused until its inputs or
+        parameters change.
+        """
+    )
+
+    # Step 1: Upload the compound list once for every step
+    st.header("Step 1: Upload a Compound List")
+    uploaded_file = st.file_uploader(
+        "Choose a CSV, XLSX or SDF file", type=["csv", "xlsx", "sdf"]
+    )
+    if uploaded_file is None:
+        st.info(
+            "Please upload a compound file with a SMILES column and, for LLE, "
+            "a pActivity column such as pIC50 or pKi."
+        )
+        return
+    workspace = st.session_state.get("workspace")
+    if workspace is None or not os.path.isdir(workspace):
+        # A new session, or one idle for so long that its folder was removed
+        if "triage_table" in st.session_state:
+            st.session_state.pop("triage_table").close()
+        for name in ("triage_file_id", "triage_workflow"):
+            st.session_state.pop(name, None)
+        # Drop the folders of sessions that have been idle for a day
+        clean_workspace()
+        os.makedirs(WORKSPACE, exist_ok=True)
+        st.session_state.workspace = tempfile.mkdtemp(dir=WORKSPACE)
+    touch_workspace(st.session_state.workspace)
+    # Convert each upload once; later reruns reuse the open table
+    if st.session_state.get("triage_file_id") != uploaded_file.file_id:
+        if "triage_table" in st.session_state:
+            st.session_state.pop("triage_table").close()
+        try:
+            table = ingest(uploaded_file, st.session_state.workspace)
+        except ValueError as e:
+            st.error(f"Could not read {uploaded_file.name}: {e}")
+            return
+        st.session_state.triage_table = table
+        st.session_state.triage_file_id = uploaded_file.file_id
+    table = st.session_state.triage_table
+    st.write(
+        f"{table.num_rows} compounds. "
+        + ", ".join(
+            f"{role}: **{column}**"
+            for role, column in table.columns.items()
+            if column
+        )
+    )
+
+    # Keep the workflow across reruns. It reads the table's SMILES, ID and
+    # activity columns in chunks and keeps its results as Parquet files in the
+    # session folder, not in memory.
+    if "triage_workflow" not in st.session_state:
+        st.session_state.triage_workflow = build_triage_workflow(
+            table, workspace=st.session_state.workspace
+        )
+    workflow = st.session_state.triage_workflow
+    workflow.set_input("compounds", table, key=table.key)
+
+    # Step 2: Pick the step to look at
+    st.header("Step 2: View a Step")
+    step = st.selectbox(
+        "Select a step",
+        list(TRIAGE_STEPS),
+        format_func=lambda name: tools[name]["display"],
+    )
+    params_text = st.text_area(
+        "Parameters (JSON)", json.dumps(workflow.steps[step]["params"])
+    )
+    try:
+        params = json.loads(params_text or "{}")
+        if not isinstance(params, dict):
+            raise ValueError("expected a JSON object")
+    except ValueError as e:
+        st.error(f"Invalid parameters: {e}")
+        return
+    workflow.set_params(step, **params)
+
+    cached = [
+        tools[name]["display"]
+        for name in TRIAGE_STEPS
+        if workflow.is_cached(name)
+    ]
+    st.caption("Up to date: " + (", ".join(cached) or "none"))
+
+    with st.spinner(f"Computing {tools[step]['display']}..."):
+        try:
+            result = workflow.get(step)
+        except Exception as e:
+            st.error(f"Error running {tools[step]['display']}: {e}")
+            return
+    st.write(result)
+
+
+if __name__ == "__main__":
+    main()
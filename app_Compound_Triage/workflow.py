@@ -0,0 +1,265 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from scheduler import scheduler  # type: ignore
+from tool_registry import is_chunked, resolve_compute  # type: ignore
+
+# Standard triage chain: tool name -> (upstream steps, default parameters)
+TRIAGE_STEPS = {
+    "smiles_explorer": (["compounds"], {}),
+    "logp_calculation": (["smiles_explorer"], {}),
+    "logd_prediction": (["smiles_explorer"], {}),
+    "pka_prediction": (["smiles_explorer"], {}),
+    "lle_calculator": (["logp_calculation"], {}),
+    "nearest_neighbours": (["smiles_explorer"], {}),
+    "scaffold_graph": (["smiles_explorer"], {}),
+}
+
+
+def hash_value(value):
+    """Return a stable hash for an input value such as a list of SMILES."""
+    try:
+        data = json.dumps(value, sort_keys=True).encode()
+    except TypeError:
+        data = pickle.dumps(value)
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_result(path):
+    """Read a step result saved as one Parquet file per chunk."""
+    tables = [
+        pq.read_table(os.path.join(path, name))
+        for name in sorted(os.listdir(path))
+    ]
+    # A column that is all null in one chunk takes its type from the others
+    return pa.concat_tables(tables, promote_options="default").to_pandas()
+
+
+class Workflow:
+    """
+    A DAG of tool steps over one compound set, evaluated lazily.
+
+    Steps follow the same contract as the headless API: func(table, **params)
+    takes a DataFrame and returns it with result columns added. A step with
+    several upstream steps gets their columns joined into one table. A step
+    reading straight from an ingested table (anything with iter_compounds())
+    is run chunk by chunk unless it is added with chunked=False.
+
+    Each step keeps only its latest result, memoised by a key hashed from the
+    step's parameters and the keys of its upstream steps, so changing a
+    parameter only invalidates the steps downstream of it. Independent
+    branches are computed concurrently.
+
+    Results are kept in memory unless a workspace folder is given. Then each
+    result is written there as Parquet, chunk by chunk as it is computed, and
+    only read back while a later step or the caller of get() needs it.
+    """
+
+    def __init__(self, max_workers=None, workspace=None):
+        self.inputs = {}
+        self.steps = {}
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.max_workers = max_workers
+        self.workspace = workspace
+
+    def set_input(self, name, value, key=None):
+        """
+        Add or replace a source node such as the compound set. key identifies
+        the value (e.g. the hash of an ingested table) and defaults to a hash
+        of the value itself.
+        """
+        self.inputs[name] = (value, key or hash_value(value))
+
+    def add_step(self, name, func, deps=(), chunked=True, **params):
+        """
+        Add a step computed by func from the outputs of the deps steps. Set
+        chunked=False if func compares rows with each other.
+        """
+        self.steps[name] = {
+            "func": func,
+            "deps": list(deps),
+            "chunked": chunked,
+            "params": params,
+        }
+
+    def set_params(self, name, **params):
+        """
+        Replace the parameters of a step. Only the step and the steps below it
+        get new keys, so only they are recomputed on the next get().
+        """
+        self.steps[name]["params"] = params
+
+    def key(self, name):
+        """Return the memoisation key of a node."""
+        if name in self.inputs:
+            return self.inputs[name][1]
+        step = self.steps[name]
+        func = step["func"]
+        return hash_value(
+            {
+                "step": name,
+                "func": getattr(func, "__module__", "")
+                + "."
+                + getattr(func, "__qualname__", repr(func)),
+                "params": step["params"],
+                "deps": [self.key(dep) for dep in step["deps"]],
+            }
+        )
+
+    def is_cached(self, name, key=None):
+        if name in self.inputs:
+            return True
+        with self.lock:
+            cached_key = self.cache.get(name, (None, None))[0]
+        return cached_key == (key or self.key(name))
+
+    def get(self, *names):
+        """
+        Return the output of one node, or a tuple of outputs for several,
+        computing only the steps they need that are not already memoised.
+        """
+        keys = {}
+        pending = []
+
+        def collect(name):
+            if name in keys:
+                return
+            if name not in self.inputs and name not in self.steps:
+                raise KeyError(f"Unknown workflow node: {name}")
+            keys[name] = self.key(name)
+            if self.is_cached(name, keys[name]):
+                return
+            for dep in self.steps[name]["deps"]:
+                collect(dep)
+            pending.append(name)
+
+        for name in names:
+            collect(name)
+        self.run(pending, keys)
+
+        outputs = [self.value(name) for name in names]
+        return outputs[0] if len(outputs) == 1 else tuple(outputs)
+
+    def value(self, name):
+        if name in self.inputs:
+            return self.inputs[name][0]
+        with self.lock:
+            result = self.cache[name][1]
+        return result if self.workspace is None else read_result(result)
+
+    def run(self, pending, keys):
+        """
+        Compute the pending steps (in dependency order), submitting each one as
+        soon as its upstream steps are done.
+        """
+        remaining = list(pending)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while remaining or running:
+                for name in list(remaining):
+                    step = self.steps[name]
+                    if any(
+                        dep in remaining or dep in running.values()
+                        for dep in step["deps"]
+                    ):
+                        continue
+                    tables = [self.value(dep) for dep in step["deps"]]
+                    future = executor.submit(
+                        self.call, name, keys[name], tables
+                    )
+                    running[future] = name
+                    remaining.remove(name)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    result = future.result()
+                    with self.lock:
+                        # Replace the step's previous result
+                        old = self.cache.get(name, (None, None))[1]
+                        self.cache[name] = (keys[name], result)
+                    if self.workspace is not None:
+                        if old is not None and old != result:
+                            shutil.rmtree(old, ignore_errors=True)
+
+    def call(self, name, key, tables):
+        """Run one step under a CPU lease from the shared scheduler."""
+        step = self.steps[name]
+        func, params = step["func"], step["params"]
+        if len(tables) == 1 and hasattr(tables[0], "iter_compounds"):
+            chunks = tables[0].iter_compounds()
+            if not step["chunked"]:
+                chunks = [pd.concat(chunks, ignore_index=True)]
+        else:
+            table = tables[0]
+            for other in tables[1:]:
+                new = [c for c in other.columns if c not in table.columns]
+                table = table.join(other[new])
+            chunks = [table]
+        with scheduler.lease():
+            results = (func(chunk, **params) for chunk in chunks)
+            if self.workspace is None:
+                results = list(results)
+                if len(results) == 1:
+                    return results[0]
+                return pd.concat(results, ignore_index=True)
+            return self.save(f"{name}-{key}", results)
+
+    def save(self, folder, results):
+        """Write result chunks to a workspace folder and return its path."""
+        path = os.path.join(self.workspace, folder)
+        os.makedirs(path, exist_ok=True)
+        try:
+            for i, result in enumerate(results):
+                result.to_parquet(
+                    os.path.join(path, f"{i:06d}.parquet"), index=False
+                )
+        except BaseException:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+        return path
+
+    def clear(self):
+        """Drop all memoised results."""
+        with self.lock:
+            results = [result for _, result in self.cache.values()]
+            self.cache.clear()
+        if self.workspace is not None:
+            for path in results:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def build_triage_workflow(compounds, max_workers=None, workspace=None):
+    """
+    Build the standard triage workflow over one compound set, a DataFrame or
+    an ingested table: SMILES Explorer feeds logP (then LLE), logD, pKa,
+    Nearest Neighbours and Scaffold Graph, which run independently. Results
+    are saved in workspace if given.
+    """
+    workflow = Workflow(max_workers=max_workers, workspace=workspace)
+    workflow.set_input(
+        "compounds", compounds, key=getattr(compounds, "key", None)
+    )
+    for name, (deps, params) in TRIAGE_STEPS.items():
+        func = resolve_compute(name)
+        if func is None:
+            func = missing_compute(name)
+        workflow.add_step(name, func, deps, is_chunked(name), **params)
+    return workflow
+
+
+def missing_compute(name):
+    def compute(*args, **kwargs):
+        raise RuntimeError(f"{name} has no compute function")
+
+    compute.__qualname__ = f"missing_compute.{name}"
+    return compute
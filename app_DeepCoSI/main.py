@@ -1,8 +1,11 @@
 import os
 import subprocess
+from contextlib import ExitStack
 
 import streamlit as st
 
+from scheduler import scheduler  # type: ignore
+
 
 def main():
     st.title(
@@ -20,9 +23,6 @@ def main():
     st.header("Step 1: Upload a PDB File")
     uploaded_file = st.file_uploader("Choose a PDB file", type="pdb")
 
-    # Optional: Number of processors
-    n_processors = os.cpu_count()
-
     # Step 2: Run the script (job name derived automatically)
     if st.button("Run DeepCoSI Script"):
         if uploaded_file is not None:
@@ -50,8 +50,20 @@ def main():
             st.write("Running DeepCoSI script with the following command:")
             st.code(" ".join(command))
 
-            # Execute the command
-            result = subprocess.run(command, capture_output=True, text=True)
+            # Execute the command once the scheduler has free cores for it
+            with ExitStack() as stack:
+                with st.spinner("Waiting for free CPU cores..."):
+                    lease = stack.enter_context(
+                        scheduler.lease(in_process=False)
+                    )
+                st.write(f"Running on {lease.cores} CPU core(s).")
+                with st.spinner("Running DeepCoSI..."):
+                    result = subprocess.run(
+                        command,
+                        capture_output=True,
+                        text=True,
+                        env=lease.env(),
+                    )
 
             # Display the result
             if result.returncode == 0:
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from scheduler import THREAD_ENV_VARS, CPUScheduler
+
+# A BLAS-heavy job that, left alone, uses every core for its matrix products
+JOB = (
+    "import numpy as np\n"
+    "a = np.random.rand({size}, {size})\n"
+    "for _ in range({repeats}):\n"
+    "    a @ a\n"
+)
+
+
+def run_job(code, env):
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+
+def run_unscheduled(code, n_jobs):
+    """Start every job at once with the libraries' default thread counts."""
+    env = {k: v for k, v in os.environ.items() if k not in THREAD_ENV_VARS}
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        list(executor.map(lambda _: run_job(code, env), range(n_jobs)))
+
+
+def run_scheduled(code, n_jobs, cores, max_jobs):
+    """Start every job at once, each waiting for a lease from a scheduler."""
+    scheduler = CPUScheduler(total_cores=cores, max_jobs=max_jobs)
+
+    def job(_):
+        with scheduler.lease(in_process=False) as lease:
+            run_job(code, lease.env())
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        list(executor.map(job, range(n_jobs)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare throughput of concurrent jobs with and without "
+        "the CPU scheduler."
+    )
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--cores", type=int, default=os.cpu_count())
+    parser.add_argument("--max-jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    code = JOB.format(size=args.size, repeats=args.repeats)
+    print(f"{args.cores} cores, {args.size}x{args.size} matrices")
+    print(f"{'jobs':>5} {'scheduler':>10} {'seconds':>9} {'jobs/min':>9}")
+    for n_jobs in args.jobs:
+        for scheduled in (False, True):
+            start = time.perf_counter()
+            if scheduled:
+                run_scheduled(code, n_jobs, args.cores, args.max_jobs)
+            else:
+                run_unscheduled(code, n_jobs)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{n_jobs:>5} {'on' if scheduled else 'off':>10} "
+                f"{elapsed:>9.2f} "
+                f"{60 * n_jobs / elapsed:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
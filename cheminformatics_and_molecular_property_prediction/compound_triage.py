@@ -0,0 +1,7 @@
+import sys
+
+sys.path.append("app_Compound_Triage")
+
+from app_Compound_Triage.main import main  # type: ignore
+
+main()
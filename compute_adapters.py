@@ -0,0 +1,160 @@
+"""
+Compute functions for running the cheminformatics tools without Streamlit.
+
+Every function takes a compound table (a DataFrame with one row per compound
+and a "smiles" column, plus "id" and "activity" where available) and keyword
+parameters, and returns the table with its result columns added. Rows stay in
+the same order, and invalid SMILES give empty results rather than errors.
+Pages point at these through the "compute" entry in menu_config.json.
+"""
+
+import pandas as pd
+from rdkit import Chem, DataStructs
+from rdkit.Chem import (
+    AllChem,
+    Crippen,
+    Descriptors,
+    Lipinski,
+    rdFingerprintGenerator,
+    rdMolDescriptors,
+)
+from rdkit.Chem.Scaffolds import MurckoScaffold
+
+
+def to_mols(table):
+    """Return one RDKit molecule (or None if it does not parse) per row."""
+    if "smiles" not in table.columns:
+        raise ValueError("The compound table has no 'smiles' column.")
+    return [
+        Chem.MolFromSmiles(smiles) if isinstance(smiles, str) else None
+        for smiles in table["smiles"]
+    ]
+
+
+def add_columns(table, mols, columns):
+    """Return a copy of table with a column per (name, function of a mol)."""
+    table = table.copy()
+    for name, func in columns.items():
+        table[name] = [None if mol is None else func(mol) for mol in mols]
+    return table
+
+
+def fingerprints(mols, radius, n_bits):
+    generator = rdFingerprintGenerator.GetMorganGenerator(
+        radius=radius, fpSize=n_bits
+    )
+    return [
+        None if mol is None else generator.GetFingerprint(mol) for mol in mols
+    ]
+
+
+def smiles_explorer(table):
+    """Canonical SMILES and basic descriptors for each compound."""
+    mols = to_mols(table)
+    table = add_columns(
+        table,
+        mols,
+        {
+            "canonical_smiles": Chem.MolToSmiles,
+            "mol_weight": Descriptors.MolWt,
+            "heavy_atoms": lambda mol: mol.GetNumHeavyAtoms(),
+            "hbd": Lipinski.NumHDonors,
+            "hba": Lipinski.NumHAcceptors,
+            "tpsa": rdMolDescriptors.CalcTPSA,
+            "rotatable_bonds": Lipinski.NumRotatableBonds,
+        },
+    )
+    table["valid"] = [mol is not None for mol in mols]
+    return table
+
+
+def logp_calculation(table):
+    """Crippen logP for each compound."""
+    return add_columns(table, to_mols(table), {"logp": Crippen.MolLogP})
+
+
+def lle_calculator(table, activity="activity", lipophilicity="logp"):
+    """
+    Lipophilic ligand efficiency, LLE = pActivity - logP. The lipophilicity
+    column is computed with logp_calculation if the table does not have it.
+    """
+    if activity not in table.columns:
+        raise ValueError(f"The compound table has no '{activity}' column.")
+    if lipophilicity not in table.columns:
+        table = logp_calculation(table)
+        lipophilicity = "logp"
+    table = table.copy()
+    pactivity = pd.to_numeric(table[activity], errors="coerce")
+    table["lle"] = pactivity - table[lipophilicity].astype(float)
+    return table
+
+
+def tanimoto_similarity_calculator(table, reference, radius=2, n_bits=2048):
+    """Tanimoto similarity of each compound to the reference SMILES."""
+    reference_mol = Chem.MolFromSmiles(reference)
+    if reference_mol is None:
+        raise ValueError(f"Invalid reference SMILES: {reference}")
+    ref_fp = fingerprints([reference_mol], radius, n_bits)[0]
+    fps = fingerprints(to_mols(table), radius, n_bits)
+    table = table.copy()
+    table["similarity"] = [
+        None if fp is None else DataStructs.TanimotoSimilarity(fp, ref_fp)
+        for fp in fps
+    ]
+    return table
+
+
+def nearest_neighbours(table, radius=2, n_bits=2048):
+    """The most similar other compound in the table and its similarity."""
+    fps = fingerprints(to_mols(table), radius, n_bits)
+    valid = [i for i, fp in enumerate(fps) if fp is not None]
+    valid_fps = [fps[i] for i in valid]
+    neighbours = [None] * len(fps)
+    similarities = [None] * len(fps)
+    for position, i in enumerate(valid):
+        scores = DataStructs.BulkTanimotoSimilarity(fps[i], valid_fps)
+        scores[position] = -1.0
+        best = max(range(len(scores)), key=scores.__getitem__, default=None)
+        if best is not None and scores[best] >= 0:
+            neighbours[i] = valid[best]
+            similarities[i] = scores[best]
+    labels = table["id"] if "id" in table.columns else table["smiles"]
+    table = table.copy()
+    table["nearest_neighbour"] = [
+        None if j is None else labels.iloc[j] for j in neighbours
+    ]
+    table["nearest_similarity"] = similarities
+    return table
+
+
+def scaffold_graph(table):
+    """Bemis-Murcko scaffold of each compound and how many share it."""
+    table = add_columns(
+        table,
+        to_mols(table),
+        {"scaffold": lambda mol: MurckoScaffold.MurckoScaffoldSmiles(mol=mol)},
+    )
+    table["scaffold_count"] = table.groupby("scaffold", dropna=False)[
+        "scaffold"
+    ].transform("size")
+    return table
+
+
+def pmi_calculator(table, seed=42):
+    """Normalised PMI ratios (NPR1, NPR2) from one embedded conformer."""
+
+    def nprs(mol):
+        mol = Chem.AddHs(mol)
+        if AllChem.EmbedMolecule(mol, randomSeed=seed) != 0:
+            return (None, None)
+        return (
+            rdMolDescriptors.CalcNPR1(mol),
+            rdMolDescriptors.CalcNPR2(mol),
+        )
+
+    mols = to_mols(table)
+    values = [(None, None) if mol is None else nprs(mol) for mol in mols]
+    table = table.copy()
+    table["npr1"] = [v[0] for v in values]
+    table["npr2"] = [v[1] for v in values]
+    return table
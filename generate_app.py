@@ -432,6 +432,367 @@ def generate_app_code(config_data):
     print(f"Streamlit app generated as '{output_file}'.")
 
 
+def generate_api_code(config_data):
+    """
+    Generate a headless HTTP/JSON service and CLI that exposes one endpoint per
+    tool in menu_config.json (as loaded by tool_registry.py), calling each tool's
+    compute function directly on a worker pool instead of through Streamlit.
+    Batches are posted to /tools/<name> and can be streamed back as NDJSON.
+    Each chunk of a batch is passed to the compute function as one DataFrame,
+    which it returns with its result columns added (see compute_adapters.py).
+    """
+    lines = []
+    lines.append("import argparse")
+    lines.append("import json")
+    lines.append("import os")
+    lines.append("import sys")
+    lines.append(
+        "from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait"
+    )
+    lines.append(
+        "from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer"
+    )
+    lines.append("from urllib.parse import parse_qs, urlparse")
+    lines.append("")
+    lines.append("import pandas as pd")
+    lines.append("")
+    lines.append("from scheduler import scheduler")
+    lines.append(
+        "from tool_registry import is_chunked, resolve_compute, tools"
+    )
+    lines.append("")
+    lines.append("executor = None")
+    lines.append("cores = None")
+    lines.append("chunk_size = 256")
+    lines.append("")
+    lines.append("")
+    lines.append("def to_jsonable(obj):")
+    lines.append(
+        '    """Convert DataFrames, arrays and other non-JSON results for json.dumps."""'
+    )
+    lines.append("    if hasattr(obj, 'columns') and hasattr(obj, 'to_dict'):")
+    lines.append("        return obj.to_dict(orient='records')")
+    lines.append("    if hasattr(obj, 'tolist'):")
+    lines.append("        return obj.tolist()")
+    lines.append("    if hasattr(obj, 'to_dict'):")
+    lines.append("        return obj.to_dict()")
+    lines.append("    return str(obj)")
+    lines.append("")
+    lines.append("")
+    lines.append("def parse_inputs(body):")
+    lines.append('    """')
+    lines.append(
+        "    Return the input records and parameters from a request body: one record,"
+    )
+    lines.append(
+        "    a list of records, or an object with an inputs list and optional params."
+    )
+    lines.append("    Raises ValueError for an empty or malformed body.")
+    lines.append('    """')
+    lines.append("    params = {}")
+    lines.append("    if isinstance(body, dict) and 'inputs' in body:")
+    lines.append("        records = body['inputs']")
+    lines.append("        params = body.get('params') or {}")
+    lines.append("    elif isinstance(body, dict):")
+    lines.append("        records = [body] if body else []")
+    lines.append("    else:")
+    lines.append("        records = body")
+    lines.append("    if not isinstance(records, list) or not records:")
+    lines.append("        raise ValueError('no input records')")
+    lines.append(
+        "    if not all(isinstance(record, dict) for record in records):"
+    )
+    lines.append(
+        "        raise ValueError('every input record must be a JSON object')"
+    )
+    lines.append("    if not isinstance(params, dict):")
+    lines.append("        raise ValueError('params must be a JSON object')")
+    lines.append("    return records, params")
+    lines.append("")
+    lines.append("")
+    lines.append("def run_chunk(lease, func, start, records, params):")
+    lines.append('    """')
+    lines.append(
+        "    Call a compute function on a chunk of records as one table and return an"
+    )
+    lines.append("    output record per input, numbered from start.")
+    lines.append('    """')
+    lines.append("    try:")
+    lines.append("        # Each chunk is one of the lease's cores")
+    lines.append("        with lease.limit_threads(1):")
+    lines.append("            table = func(pd.DataFrame(records), **params)")
+    lines.append(
+        "        table = table.astype(object).where(table.notna(), None)"
+    )
+    lines.append("        rows = table.to_dict(orient='records')")
+    lines.append(
+        "        return [{'index': start + i, 'result': row} for i, row in enumerate(rows)]"
+    )
+    lines.append("    except Exception as e:")
+    lines.append("        error = f'{type(e).__name__}: {e}'")
+    lines.append(
+        "        return [{'index': start + i, 'error': error} for i in range(len(records))]"
+    )
+    lines.append("")
+    lines.append("")
+    lines.append("def run_batch(name, records, params):")
+    lines.append('    """')
+    lines.append(
+        "    Run a batch on the worker pool, yielding outputs as they complete. Tools"
+    )
+    lines.append(
+        "    that work row by row get it in chunks; the others get the whole batch."
+    )
+    lines.append('    """')
+    lines.append("    func = resolve_compute(name)")
+    lines.append("    size = chunk_size if is_chunked(name) else len(records)")
+    lines.append(
+        "    # One CPU lease per batch, running as many chunks at a time as it has"
+    )
+    lines.append(
+        "    # cores, so batches from concurrent requests do not oversubscribe the node"
+    )
+    lines.append("    with scheduler.lease(cores=cores) as lease:")
+    lines.append("        starts = list(range(0, len(records), size))")
+    lines.append("        running = set()")
+    lines.append("        while starts or running:")
+    lines.append("            while starts and len(running) < lease.cores:")
+    lines.append("                start = starts.pop(0)")
+    lines.append("                chunk = records[start:start + size]")
+    lines.append(
+        "                running.add(executor.submit(run_chunk, lease, func, start, chunk, params))"
+    )
+    lines.append(
+        "            done, running = wait(running, return_when=FIRST_COMPLETED)"
+    )
+    lines.append("            for future in done:")
+    lines.append("                yield from future.result()")
+    lines.append("")
+    lines.append("")
+    lines.append("class ToolHandler(BaseHTTPRequestHandler):")
+    lines.append("    def send_json(self, status, data):")
+    lines.append(
+        "        payload = json.dumps(data, default=to_jsonable).encode()"
+    )
+    lines.append("        self.send_response(status)")
+    lines.append(
+        "        self.send_header('Content-Type', 'application/json')"
+    )
+    lines.append(
+        "        self.send_header('Content-Length', str(len(payload)))"
+    )
+    lines.append("        self.end_headers()")
+    lines.append("        self.wfile.write(payload)")
+    lines.append("")
+    lines.append("    def do_GET(self):")
+    lines.append(
+        "        if urlparse(self.path).path.rstrip('/') not in ('', '/tools'):"
+    )
+    lines.append("            self.send_json(404, {'error': 'Not found'})")
+    lines.append("            return")
+    lines.append("        listing = {}")
+    lines.append("        for name, page in tools.items():")
+    lines.append("            listing[name] = {")
+    lines.append("                'display': page.get('display', name),")
+    lines.append("                'endpoint': f'/tools/{name}',")
+    lines.append(
+        "                'available': resolve_compute(name) is not None,"
+    )
+    lines.append("            }")
+    lines.append("        self.send_json(200, listing)")
+    lines.append("")
+    lines.append("    def do_POST(self):")
+    lines.append("        url = urlparse(self.path)")
+    lines.append("        parts = url.path.strip('/').split('/')")
+    lines.append(
+        "        if len(parts) != 2 or parts[0] != 'tools' or parts[1] not in tools:"
+    )
+    lines.append("            self.send_json(404, {'error': 'Unknown tool'})")
+    lines.append("            return")
+    lines.append("        func = resolve_compute(parts[1])")
+    lines.append("        if func is None:")
+    lines.append(
+        "            self.send_json(501, {'error': f'{parts[1]} has no compute function'})"
+    )
+    lines.append("            return")
+    lines.append(
+        "        length = int(self.headers.get('Content-Length') or 0)"
+    )
+    lines.append(
+        "        body = self.rfile.read(length) if length > 0 else b''"
+    )
+    lines.append("        if not body.strip():")
+    lines.append(
+        "            self.send_json(400, {'error': 'Missing request body'})"
+    )
+    lines.append("            return")
+    lines.append("        try:")
+    lines.append(
+        "            records, params = parse_inputs(json.loads(body))"
+    )
+    lines.append("        except ValueError as e:")
+    lines.append(
+        "            self.send_json(400, {'error': f'Invalid request body: {e}'})"
+    )
+    lines.append("            return")
+    lines.append(
+        "        stream = parse_qs(url.query).get('stream', ['0'])[0] in ('1', 'true')"
+    )
+    lines.append(
+        "        if stream or 'application/x-ndjson' in self.headers.get('Accept', ''):"
+    )
+    lines.append(
+        "            # Stream one JSON line per input as soon as it is computed"
+    )
+    lines.append("            self.send_response(200)")
+    lines.append(
+        "            self.send_header('Content-Type', 'application/x-ndjson')"
+    )
+    lines.append("            self.end_headers()")
+    lines.append(
+        "            for output in run_batch(parts[1], records, params):"
+    )
+    lines.append(
+        "                line = json.dumps(output, default=to_jsonable) + '\\n'"
+    )
+    lines.append("                self.wfile.write(line.encode())")
+    lines.append("                self.wfile.flush()")
+    lines.append("        else:")
+    lines.append("            outputs = run_batch(parts[1], records, params)")
+    lines.append(
+        "            outputs = sorted(outputs, key=lambda o: o['index'])"
+    )
+    lines.append("            self.send_json(200, {'results': outputs})")
+    lines.append("")
+    lines.append("")
+    lines.append("def serve(args):")
+    lines.append(
+        "    server = ThreadingHTTPServer((args.host, args.port), ToolHandler)"
+    )
+    lines.append(
+        "    print(f'Serving {len(tools)} tools on http://{args.host}:{args.port}/tools')"
+    )
+    lines.append("    try:")
+    lines.append("        server.serve_forever()")
+    lines.append("    except KeyboardInterrupt:")
+    lines.append("        pass")
+    lines.append("    finally:")
+    lines.append("        server.server_close()")
+    lines.append("")
+    lines.append("")
+    lines.append("def list_tools(args):")
+    lines.append("    for name in tools:")
+    lines.append(
+        "        status = 'available' if resolve_compute(name) else 'no compute function'"
+    )
+    lines.append("        print(f'{name}: {status}')")
+    lines.append("")
+    lines.append("")
+    lines.append("def run(args):")
+    lines.append("    if args.tool not in tools:")
+    lines.append("        sys.exit(f'Unknown tool: {args.tool}')")
+    lines.append("    func = resolve_compute(args.tool)")
+    lines.append("    if func is None:")
+    lines.append("        sys.exit(f'{args.tool} has no compute function')")
+    lines.append("    if args.input == '-':")
+    lines.append("        text = sys.stdin.read()")
+    lines.append("    else:")
+    lines.append("        with open(args.input, 'r') as f:")
+    lines.append("            text = f.read()")
+    lines.append("    try:")
+    lines.append("        params = json.loads(args.params)")
+    lines.append("    except ValueError as e:")
+    lines.append("        sys.exit(f'Invalid --params: {e}')")
+    lines.append("    try:")
+    lines.append("        body = json.loads(text)")
+    lines.append("    except ValueError:")
+    lines.append("        # Fall back to NDJSON, one input record per line")
+    lines.append("        body = []")
+    lines.append(
+        "        for number, line in enumerate(text.splitlines(), start=1):"
+    )
+    lines.append("            if not line.strip():")
+    lines.append("                continue")
+    lines.append("            try:")
+    lines.append("                body.append(json.loads(line))")
+    lines.append("            except ValueError as e:")
+    lines.append(
+        "                sys.exit(f'Invalid JSON on line {number} of {args.input}: {e}')"
+    )
+    lines.append("    try:")
+    lines.append("        records, body_params = parse_inputs(body)")
+    lines.append("    except ValueError as e:")
+    lines.append("        sys.exit(f'Invalid input: {e}')")
+    lines.append(
+        "    for output in run_batch(args.tool, records, {**body_params, **params}):"
+    )
+    lines.append(
+        "        print(json.dumps(output, default=to_jsonable), flush=True)"
+    )
+    lines.append("")
+    lines.append("")
+    lines.append("def main():")
+    lines.append("    global executor, cores, chunk_size")
+    lines.append(
+        "    parser = argparse.ArgumentParser(description='Headless ChemBioCatalyst tools')"
+    )
+    lines.append(
+        "    parser.add_argument('--workers', type=int, default=os.cpu_count(),"
+    )
+    lines.append(
+        "                        help='worker threads shared by all batches')"
+    )
+    lines.append(
+        "    parser.add_argument('--cores', type=int, default=scheduler.cores_per_job,"
+    )
+    lines.append("                        help='CPU cores leased per batch')")
+    lines.append(
+        "    parser.add_argument('--chunk-size', type=int, default=chunk_size)"
+    )
+    lines.append(
+        "    subparsers = parser.add_subparsers(dest='command', required=True)"
+    )
+    lines.append(
+        "    serve_parser = subparsers.add_parser('serve', help='Run the HTTP/JSON service')"
+    )
+    lines.append(
+        "    serve_parser.add_argument('--host', default='127.0.0.1')"
+    )
+    lines.append(
+        "    serve_parser.add_argument('--port', type=int, default=8502)"
+    )
+    lines.append("    serve_parser.set_defaults(func=serve)")
+    lines.append(
+        "    list_parser = subparsers.add_parser('list', help='List the available tools')"
+    )
+    lines.append("    list_parser.set_defaults(func=list_tools)")
+    lines.append(
+        "    run_parser = subparsers.add_parser('run', help='Run a batch and print NDJSON')"
+    )
+    lines.append("    run_parser.add_argument('tool')")
+    lines.append(
+        "    run_parser.add_argument('--input', default='-', help='JSON or NDJSON file')"
+    )
+    lines.append(
+        "    run_parser.add_argument('--params', default='{}', help='JSON parameters')"
+    )
+    lines.append("    run_parser.set_defaults(func=run)")
+    lines.append("    args = parser.parse_args()")
+    lines.append("    executor = ThreadPoolExecutor(max_workers=args.workers)")
+    lines.append("    cores = args.cores")
+    lines.append("    chunk_size = args.chunk_size")
+    lines.append("    args.func(args)")
+    lines.append("")
+    lines.append("")
+    lines.append("if __name__ == '__main__':")
+    lines.append("    main()")
+
+    output_file = "generated_api.py"
+    with open(output_file, "w") as f:
+        f.write("\n".join(lines))
+    print(f"Headless API generated as '{output_file}'.")
+
+
 def create_folders_and_files(config_data):
     """
     Create folders for each main menu item and empty Python scripts for each page if they do not exist.
@@ -483,9 +844,12 @@ def main():
     print(f"Configuration saved to '{config_file}'.")
 
     generate_app_code(config_data)
+    generate_api_code(config_data)
     create_folders_and_files(config_data)
     print("\nAll done! To run your Streamlit app, use:")
     print("   streamlit run generated_app.py")
+    print("To serve the tools headlessly over HTTP/JSON, use:")
+    print("   python generated_api.py serve")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from scheduler import scheduler
+from tool_registry import is_chunked, resolve_compute, tools
+
+executor = None
+cores = None
+chunk_size = 256
+
+
+def to_jsonable(obj):
+    """Convert DataFrames, arrays and other non-JSON results for json.dumps."""
+    if hasattr(obj, 'columns') and hasattr(obj, 'to_dict'):
+        return obj.to_dict(orient='records')
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    return str(obj)
+
+
+def parse_inputs(body):
+    """
+    Return the input records and parameters from a request body: one record,
+    a list of records, or an object with an inputs list and optional params.
+    Raises ValueError for an empty or malformed body.
+    """
+    params = {}
+    if isinstance(body, dict) and 'inputs' in body:
+        records = body['inputs']
+        params = body.get('params') or {}
+    elif isinstance(body, dict):
+        records = [body] if body else []
+    else:
+        records = body
+    if not isinstance(records, list) or not records:
+        raise ValueError('no input records')
+    if not all(isinstance(record, dict) for record in records):
+        raise ValueError('every input record must be a JSON object')
+    if not isinstance(params, dict):
+        raise ValueError('params must be a JSON object')
+    return records, params
+
+
+def run_chunk(lease, func, start, records, params):
+    """
+    Call a compute function on a chunk of records as one table and return an
+    output record per input, numbered from start.
+    """
+    try:
+        # Each chunk is one of the lease's cores
+        with lease.limit_threads(1):
+            table = func(pd.DataFrame(records), **params)
+        table = table.astype(object).where(table.notna(), None)
+        rows = table.to_dict(orient='records')
+        return [{'index': start + i, 'result': row} for i, row in enumerate(rows)]
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+        return [{'index': start + i, 'error': error} for i in range(len(records))]
+
+
+def run_batch(name, records, params):
+    """
+    Run a batch on the worker pool, yielding outputs as they complete. Tools
+    that work row by row get it in chunks; the others get the whole batch.
+    """
+    func = resolve_compute(name)
+    size = chunk_size if is_chunked(name) else len(records)
+    # One CPU lease per batch, running as many chunks at a time as it has
+    # cores, so batches from concurrent requests do not oversubscribe the node
+    with scheduler.lease(cores=cores) as lease:
+        starts = list(range(0, len(records), size))
+        running = set()
+        while starts or running:
+            while starts and len(running) < lease.cores:
+                start = starts.pop(0)
+                chunk = records[start:start + size]
+                running.add(executor.submit(run_chunk, lease, func, start, chunk, params))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+class ToolHandler(BaseHTTPRequestHandler):
+    def send_json(self, status, data):
+        payload = json.dumps(data, default=to_jsonable).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if urlparse(self.path).path.rstrip('/') not in ('', '/tools'):
+            self.send_json(404, {'error': 'Not found'})
+            return
+        listing = {}
+        for name, page in tools.items():
+            listing[name] = {
+                'display': page.get('display', name),
+                'endpoint': f'/tools/{name}',
+                'available': resolve_compute(name) is not None,
+            }
+        self.send_json(200, listing)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        parts = url.path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] != 'tools' or parts[1] not in tools:
+            self.send_json(404, {'error': 'Unknown tool'})
+            return
+        func = resolve_compute(parts[1])
+        if func is None:
+            self.send_json(501, {'error': f'{parts[1]} has no compute function'})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length > 0 else b''
+        if not body.strip():
+            self.send_json(400, {'error': 'Missing request body'})
+            return
+        try:
+            records, params = parse_inputs(json.loads(body))
+        except ValueError as e:
+            self.send_json(400, {'error': f'Invalid request body: {e}'})
+            return
+        stream = parse_qs(url.query).get('stream', ['0'])[0] in ('1', 'true')
+        if stream or 'application/x-ndjson' in self.headers.get('Accept', ''):
+            # Stream one JSON line per input as soon as it is computed
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.end_headers()
+            for output in run_batch(parts[1], records, params):
+                line = json.dumps(output, default=to_jsonable) + '\n'
+                self.wfile.write(line.encode())
+                self.wfile.flush()
+        else:
+            outputs = run_batch(parts[1], records, params)
+            outputs = sorted(outputs, key=lambda o: o['index'])
+            self.send_json(200, {'results': outputs})
+
+
+def serve(args):
+    server = ThreadingHTTPServer((args.host, args.port), ToolHandler)
+    print(f'Serving {len(tools)} tools on http://{args.host}:{args.port}/tools')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def list_tools(args):
+    for name in tools:
+        status = 'available' if resolve_compute(name) else 'no compute function'
+        print(f'{name}: {status}')
+
+
+def run(args):
+    if args.tool not in tools:
+        sys.exit(f'Unknown tool: {args.tool}')
+    func = resolve_compute(args.tool)
+    if func is None:
+        sys.exit(f'{args.tool} has no compute function')
+    if args.input == '-':
+        text = sys.stdin.read()
+    else:
+        with open(args.input, 'r') as f:
+            text = f.read()
+    try:
+        params = json.loads(args.params)
+    except ValueError as e:
+        sys.exit(f'Invalid --params: {e}')
+    try:
+        body = json.loads(text)
+    except ValueError:
+        # Fall back to NDJSON, one input record per line
+        body = []
+        for number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                body.append(json.loads(line))
+            except ValueError as e:
+                sys.exit(f'Invalid JSON on line {number} of {args.input}: {e}')
+    try:
+        records, body_params = parse_inputs(body)
+    except ValueError as e:
+        sys.exit(f'Invalid input: {e}')
+    for output in run_batch(args.tool, records, {**body_params, **params}):
+        print(json.dumps(output, default=to_jsonable), flush=True)
+
+
+def main():
+    global executor, cores, chunk_size
+    parser = argparse.ArgumentParser(description='Headless ChemBioCatalyst tools')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='worker threads shared by all batches')
+    parser.add_argument('--cores', type=int, default=scheduler.cores_per_job,
+                        help='CPU cores leased per batch')
+    parser.add_argument('--chunk-size', type=int, default=chunk_size)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help='Run the HTTP/JSON service')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8502)
+    serve_parser.set_defaults(func=serve)
+    list_parser = subparsers.add_parser('list', help='List the available tools')
+    list_parser.set_defaults(func=list_tools)
+    run_parser = subparsers.add_parser('run', help='Run a batch and print NDJSON')
+    run_parser.add_argument('tool')
+    run_parser.add_argument('--input', default='-', help='JSON or NDJSON file')
+    run_parser.add_argument('--params', default='{}', help='JSON parameters')
+    run_parser.set_defaults(func=run)
+    args = parser.parse_args()
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+    cores = args.cores
+    chunk_size = args.chunk_size
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,324 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+WORKSPACE = "workspace"
+METADATA_KEY = b"chembiocatalyst"
+ROW_GROUP_SIZE = 65536
+CSV_BLOCK_SIZE = 16 << 20
+
+# Candidate header names for each role, in order of preference. Activity is
+# only taken from -log10(molar) headers, since LLE subtracts logP from it; raw
+# IC50/Ki/Kd/EC50 columns have unknown units and are left alone.
+COLUMN_NAMES = {
+    "smiles": ["smiles", "canonical_smiles", "isomeric_smiles", "smi"],
+    "id": ["id", "compound_id", "mol_id", "molecule_id", "name", "title"],
+    "activity": [
+        "pactivity",
+        "pchembl_value",
+        "pic50",
+        "pki",
+        "pkd",
+        "pec50",
+        "pxc50",
+    ],
+}
+
+
+class IngestedTable:
+    """
+    A compound table converted once to Parquet in the workspace.
+
+    Opening one only reads the Parquet footer, so it takes the same time
+    whatever the size of the table. Columns are read on demand through a
+    memory map, either whole or in chunks of rows. Call close() (or use it as
+    a context manager) to release the memory map.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = pq.ParquetFile(path, memory_map=True)
+        metadata = self.file.schema_arrow.metadata or {}
+        info = json.loads(metadata.get(METADATA_KEY, b"{}"))
+        self.key = info.get("key")
+        self.columns = info.get("columns", {})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    @property
+    def num_rows(self):
+        return self.file.metadata.num_rows
+
+    @property
+    def column_names(self):
+        return self.file.schema_arrow.names
+
+    def read(self, columns=None):
+        """Read the given columns (default: all) into a DataFrame."""
+        return self.file.read(columns=columns).to_pandas()
+
+    def iter_chunks(self, columns=None, chunk_size=ROW_GROUP_SIZE):
+        """Yield the given columns as DataFrames of at most chunk_size rows."""
+        for batch in self.file.iter_batches(
+            batch_size=chunk_size, columns=columns
+        ):
+            yield batch.to_pandas()
+
+    def iter_compounds(self, chunk_size=ROW_GROUP_SIZE):
+        """
+        Yield only the SMILES, ID and activity columns in chunks, renamed to
+        "smiles", "id" and "activity" as the compute functions expect.
+        """
+        roles = {
+            column: role for role, column in self.columns.items() if column
+        }
+        for chunk in self.iter_chunks(list(roles), chunk_size):
+            yield chunk.rename(columns=roles)
+
+
+def hash_file(path):
+    """Return the sha256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_text(field_type):
+    return pa.types.is_string(field_type) or pa.types.is_large_string(
+        field_type
+    )
+
+
+def is_numeric(field_type):
+    return pa.types.is_integer(field_type) or pa.types.is_floating(field_type)
+
+
+def candidates(names, role):
+    """
+    Return the headers that could hold a role, best first: exact names (case
+    insensitive), then names containing a candidate as a word, e.g. "Compound
+    ID".
+    """
+    lowered = {name.lower().strip(): name for name in names}
+    words = {low: re.split(r"[^a-z0-9]+", low) for low in lowered}
+    matches = [lowered[c] for c in COLUMN_NAMES[role] if c in lowered]
+    for c in COLUMN_NAMES[role]:
+        for low, name in lowered.items():
+            if c in words[low] and name not in matches:
+                matches.append(name)
+    return matches
+
+
+def infer_columns(schema):
+    """
+    Return the SMILES, ID and activity columns of a table schema. The first
+    text column matching SMILES and the first numeric column matching activity
+    are used; roles with no suitable column are None.
+    """
+    columns = {}
+    for role in COLUMN_NAMES:
+        matches = candidates(schema.names, role)
+        if role == "smiles":
+            # Fall back to a non-text match so validation can report it
+            text = [m for m in matches if is_text(schema.field(m).type)]
+            matches = text or matches
+        elif role == "activity":
+            matches = [m for m in matches if is_numeric(schema.field(m).type)]
+        columns[role] = matches[0] if matches else None
+    return columns
+
+
+def validate_columns(schema, columns):
+    """
+    Raise ValueError if the table has no SMILES column or it is not text. The
+    ID and activity columns are optional.
+    """
+    if columns["smiles"] is None:
+        raise ValueError(
+            f"No SMILES column found. Columns: {', '.join(schema.names)}"
+        )
+    if not is_text(schema.field(columns["smiles"]).type):
+        raise ValueError(f"SMILES column '{columns['smiles']}' is not text.")
+
+
+def with_columns(schema, key, columns):
+    """Return schema with the upload hash and inferred columns as metadata."""
+    metadata = dict(schema.metadata or {})
+    metadata[METADATA_KEY] = json.dumps({"key": key, "columns": columns})
+    return schema.with_metadata(metadata)
+
+
+def open_csv(path, all_text=False):
+    """
+    Open a CSV file as a stream of record batches. Types are inferred from the
+    first block, with SMILES and ID columns read as text and integer columns as
+    floats (so later decimals still fit), or every column as text if all_text.
+    """
+    read_options = pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE)
+    reader = pa_csv.open_csv(path, read_options=read_options)
+    schema = reader.schema
+    reader.close()
+    if all_text:
+        column_types = {name: pa.string() for name in schema.names}
+    else:
+        column_types = {
+            field.name: pa.float64()
+            for field in schema
+            if pa.types.is_integer(field.type)
+        }
+        for role in ("smiles", "id"):
+            for name in candidates(schema.names, role):
+                column_types[name] = pa.string()
+    return pa_csv.open_csv(
+        path,
+        read_options=read_options,
+        convert_options=pa_csv.ConvertOptions(column_types=column_types),
+    )
+
+
+def write_csv(csv_path, parquet_path, key):
+    """Stream a CSV file into a Parquet file, one block at a time."""
+    try:
+        write_batches(open_csv(csv_path), parquet_path, key)
+    except pa.ArrowInvalid:
+        # A column changed type after the first block; read it all as text
+        write_batches(open_csv(csv_path, all_text=True), parquet_path, key)
+
+
+def write_batches(reader, parquet_path, key):
+    columns = infer_columns(reader.schema)
+    validate_columns(reader.schema, columns)
+    schema = with_columns(reader.schema, key, columns)
+    with pq.ParquetWriter(parquet_path, schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+
+
+def read_sdf(path):
+    """
+    Read an SDF file into an Arrow table, one row per molecule. Every SD tag
+    found in any record becomes a column; tags whose values have different
+    types across records are stored as text.
+    """
+    from rdkit import Chem
+
+    rows = []
+    with open(path, "rb") as f:
+        for mol in Chem.ForwardSDMolSupplier(f):
+            if mol is None:
+                continue
+            row = {
+                "ID": mol.GetProp("_Name"),
+                "SMILES": Chem.MolToSmiles(mol),
+            }
+            row.update(mol.GetPropsAsDict())
+            rows.append(row)
+
+    names = list(dict.fromkeys(name for row in rows for name in row))
+    arrays = {}
+    for name in names:
+        values = [row.get(name) for row in rows]
+        types = {type(v) for v in values if v is not None}
+        if types == {int, float}:
+            values = [None if v is None else float(v) for v in values]
+        elif len(types) > 1:
+            values = [None if v is None else str(v) for v in values]
+        arrays[name] = pa.array(values)
+    return pa.table(arrays)
+
+
+def ingest(uploaded_file, workspace=WORKSPACE):
+    """
+    Convert an uploaded CSV, XLSX or SDF file (a Streamlit upload or a path) to
+    Parquet in the workspace and return it as an IngestedTable.
+
+    The Parquet file is named after the hash of the upload, so later calls with
+    the same file skip the conversion and only open the existing file. Only
+    the Parquet file is kept; copies of the upload and the CSV converted from
+    XLSX are deleted once it is written.
+    """
+    os.makedirs(workspace, exist_ok=True)
+    if isinstance(uploaded_file, str):
+        name = uploaded_file
+        source_path = uploaded_file
+        key = hash_file(source_path)
+    else:
+        name = uploaded_file.name
+        data = uploaded_file.getbuffer()
+        key = hashlib.sha256(data).hexdigest()
+        source_path = None
+    ext = os.path.splitext(name)[1].lower()
+    if ext not in (".csv", ".xlsx", ".sdf"):
+        raise ValueError(f"Unsupported file type: {ext}")
+    parquet_path = os.path.join(workspace, f"{key}.parquet")
+    if os.path.exists(parquet_path):
+        return IngestedTable(parquet_path)
+
+    intermediates = []
+    # Write to a temporary name first so a partial file is never picked up
+    tmp_path = parquet_path + ".tmp"
+    try:
+        if source_path is None:
+            # Save the upload so pyarrow, xlsx2csv and RDKit can read it
+            source_path = os.path.join(workspace, f"{key}{ext}")
+            intermediates.append(source_path)
+            with open(source_path, "wb") as f:
+                f.write(data)
+        if ext == ".sdf":
+            table = read_sdf(source_path)
+            columns = infer_columns(table.schema)
+            validate_columns(table.schema, columns)
+            table = table.replace_schema_metadata(
+                with_columns(table.schema, key, columns).metadata
+            )
+            pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+        else:
+            if ext == ".xlsx":
+                from xlsx2csv import Xlsx2csv
+
+                csv_path = os.path.join(workspace, f"{key}.xlsx.csv")
+                intermediates.append(csv_path)
+                Xlsx2csv(source_path, outputencoding="utf-8").convert(csv_path)
+                source_path = csv_path
+            write_csv(source_path, tmp_path, key)
+        os.replace(tmp_path, parquet_path)
+    finally:
+        for path in intermediates + [tmp_path]:
+            if os.path.exists(path):
+                os.remove(path)
+    return IngestedTable(parquet_path)
+
+
+def touch_workspace(path):
+    """Mark a session folder as in use, so clean_workspace() keeps it."""
+    os.makedirs(path, exist_ok=True)
+    os.utime(path)
+
+
+def clean_workspace(workspace=WORKSPACE, max_age=24 * 60 * 60):
+    """
+    Delete the session folders in the workspace that have not been used (see
+    touch_workspace()) or written to for max_age seconds.
+    """
+    if not os.path.isdir(workspace):
+        return
+    now = time.time()
+    for entry in os.scandir(workspace):
+        if entry.is_dir() and now - entry.stat().st_mtime > max_age:
+            shutil.rmtree(entry.path, ignore_errors=True)
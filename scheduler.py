@@ -0,0 +1,213 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process core slots
+    fcntl = None
+
+# Environment variables read by OpenMP, BLAS and NumExpr for their thread pools
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+# Jobs that share the node when neither cores_per_job nor max_jobs is set
+DEFAULT_MAX_JOBS = 4
+
+# Seconds between attempts to lock core slots held by other processes
+SLOT_POLL_INTERVAL = 0.1
+
+
+def thread_env(cores, env=None):
+    """Return a copy of env (default: os.environ) with thread pools capped."""
+    env = dict(os.environ if env is None else env)
+    for var in THREAD_ENV_VARS:
+        env[var] = str(cores)
+    return env
+
+
+class Lease:
+    """A number of CPU cores granted to one job by a CPUScheduler."""
+
+    def __init__(self, cores):
+        self.cores = cores
+
+    def env(self, env=None):
+        """Environment for a subprocess that should use only this lease."""
+        return thread_env(self.cores, env)
+
+    @contextmanager
+    def limit_threads(self, cores=None):
+        """
+        Limit the OpenMP threads started from the calling thread to cores
+        (default: the lease's), and restore the limit on exit. The limit is
+        per thread, so enter and exit this on the thread doing the work.
+        """
+        from threadpoolctl import threadpool_limits
+
+        limits = threadpool_limits(
+            limits=cores or self.cores, user_api="openmp"
+        )
+        try:
+            yield self
+        finally:
+            limits.restore_original_limits()
+
+
+class CPUScheduler:
+    """
+    Hands out CPU cores to heavy jobs so that, together, they never use more
+    than total_cores and no more than max_jobs run at once. Jobs that do not
+    fit wait in first-come, first-served order.
+
+    By default max_jobs is DEFAULT_MAX_JOBS and a lease is an equal share of
+    total_cores. Subprocesses get their lease through lease.env(). For jobs
+    running in this process, lease() limits OpenMP on the calling thread to
+    the lease's cores until it ends. The BLAS and torch pools are shared by
+    the whole process, so they are capped at cores_per_job and never raised
+    or lowered per lease.
+
+    Given a slots_dir, leases also lock one file per core there, so that
+    every process using the same folder and total_cores shares the cores
+    (only first-come, first-served within each process).
+    """
+
+    def __init__(
+        self,
+        total_cores=None,
+        max_jobs=None,
+        cores_per_job=None,
+        slots_dir=None,
+    ):
+        self.total_cores = total_cores or os.cpu_count() or 1
+        if not cores_per_job:
+            cores_per_job = self.total_cores // (max_jobs or DEFAULT_MAX_JOBS)
+        self.cores_per_job = min(max(1, cores_per_job), self.total_cores)
+        self.max_jobs = max_jobs or max(
+            1, self.total_cores // self.cores_per_job
+        )
+        self.slots_dir = slots_dir if fcntl is not None else None
+        self.free_cores = self.total_cores
+        self.running = 0
+        self.condition = threading.Condition()
+        self.next_ticket = 0
+        self.serving = 0
+        self.abandoned = set()
+
+    @contextmanager
+    def lease(self, cores=None, in_process=True):
+        """
+        Wait until cores (default: cores_per_job) are free and hold them. Set
+        in_process=False for jobs that only run subprocesses, so the thread
+        pools of this process are left alone.
+        """
+        cores = min(cores or self.cores_per_job, self.total_cores)
+        with self.condition:
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            try:
+                self.condition.wait_for(
+                    lambda: ticket == self.serving
+                    and self.running < self.max_jobs
+                    and self.free_cores >= cores
+                )
+            except BaseException:
+                # Give up the ticket so the jobs behind it are not stuck
+                self.abandoned.add(ticket)
+                self.advance()
+                self.condition.notify_all()
+                raise
+            self.serving += 1
+            self.advance()
+            self.running += 1
+            self.free_cores -= cores
+            self.condition.notify_all()
+        slots = []
+        try:
+            if self.slots_dir is not None:
+                slots = self.lock_slots(cores)
+            lease = Lease(cores)
+            if in_process:
+                self.limit_process_threads()
+                with lease.limit_threads():
+                    yield lease
+            else:
+                yield lease
+        finally:
+            for slot in slots:
+                slot.close()
+            with self.condition:
+                self.running -= 1
+                self.free_cores += cores
+                self.condition.notify_all()
+
+    def advance(self):
+        """Skip the tickets of waiters that gave up."""
+        while self.serving in self.abandoned:
+            self.abandoned.remove(self.serving)
+            self.serving += 1
+
+    def lock_slots(self, cores):
+        """
+        Wait until cores of the core slot files shared with other processes
+        are free, and return them locked. Closing a file releases its slot,
+        as does the process exiting.
+        """
+        os.makedirs(self.slots_dir, exist_ok=True)
+        while True:
+            slots = []
+            try:
+                for i in range(self.total_cores):
+                    path = os.path.join(self.slots_dir, f"core-{i}.lock")
+                    slot = open(path, "a")
+                    try:
+                        fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        slot.close()
+                        continue
+                    slots.append(slot)
+                    if len(slots) == cores:
+                        return slots
+            finally:
+                if len(slots) < cores:
+                    # Let the others finish rather than hold part of a lease
+                    for slot in slots:
+                        slot.close()
+            time.sleep(SLOT_POLL_INTERVAL)
+
+    def limit_process_threads(self):
+        """Cap the process-wide BLAS and torch pools at cores_per_job."""
+        from threadpoolctl import threadpool_limits
+
+        threadpool_limits(limits=self.cores_per_job, user_api="blas")
+        torch = sys.modules.get("torch")
+        if torch is not None:
+            torch.set_num_threads(self.cores_per_job)
+
+    @property
+    def queued(self):
+        """Number of jobs waiting for a lease."""
+        with self.condition:
+            return self.next_ticket - self.serving - len(self.abandoned)
+
+
+# One scheduler per process, shared by every page, session and API worker.
+# Every process on the node (the Streamlit app, generated_api.py serve, ...)
+# locks core slots in the same folder, so together they use at most
+# CHEMBIOCATALYST_CPUS cores; give them all the same value.
+scheduler = CPUScheduler(
+    total_cores=int(os.environ.get("CHEMBIOCATALYST_CPUS", 0)) or None,
+    max_jobs=int(os.environ.get("CHEMBIOCATALYST_MAX_JOBS", 0)) or None,
+    cores_per_job=int(os.environ.get("CHEMBIOCATALYST_CORES_PER_JOB", 0))
+    or None,
+    slots_dir=os.environ.get("CHEMBIOCATALYST_SLOTS_DIR")
+    or os.path.join(tempfile.gettempdir(), "chembiocatalyst-cores"),
+)
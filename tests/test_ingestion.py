@@ -0,0 +1,125 @@
+import os
+
+import pyarrow as pa
+import pytest
+
+import ingestion
+from ingestion import (
+    clean_workspace,
+    infer_columns,
+    ingest,
+    touch_workspace,
+    validate_columns,
+)
+
+
+def schema(**fields):
+    return pa.schema(list(fields.items()))
+
+
+def test_infer_columns_exact_names():
+    columns = infer_columns(
+        schema(SMILES=pa.string(), ID=pa.string(), pIC50=pa.float64())
+    )
+    assert columns == {"smiles": "SMILES", "id": "ID", "activity": "pIC50"}
+
+
+def test_infer_columns_word_matches():
+    columns = infer_columns(
+        pa.schema(
+            [
+                ("Compound ID", pa.string()),
+                ("Parent SMILES", pa.string()),
+                ("pKi (human)", pa.float64()),
+            ]
+        )
+    )
+    assert columns == {
+        "smiles": "Parent SMILES",
+        "id": "Compound ID",
+        "activity": "pKi (human)",
+    }
+
+
+def test_infer_columns_prefers_text_smiles():
+    columns = infer_columns(
+        schema(smi=pa.float64(), canonical_smiles=pa.string())
+    )
+    assert columns["smiles"] == "canonical_smiles"
+
+
+def test_infer_columns_activity_is_numeric_p_scale_only():
+    columns = infer_columns(
+        schema(smiles=pa.string(), pIC50=pa.string(), IC50=pa.float64())
+    )
+    assert columns["activity"] is None
+    assert columns["id"] is None
+
+
+def test_validate_columns():
+    validate_columns(
+        schema(smiles=pa.string()),
+        {"smiles": "smiles", "id": None, "activity": None},
+    )
+    with pytest.raises(ValueError, match="No SMILES column"):
+        validate_columns(
+            schema(name=pa.string()),
+            {"smiles": None, "id": "name", "activity": None},
+        )
+    with pytest.raises(ValueError, match="is not text"):
+        validate_columns(
+            schema(smiles=pa.int64()),
+            {"smiles": "smiles", "id": None, "activity": None},
+        )
+
+
+def test_ingest_csv(tmp_path):
+    path = tmp_path / "compounds.csv"
+    path.write_text("ID,SMILES,pIC50\n1,CCO,6.5\n2,c1ccccc1,7\n")
+    with ingest(str(path), str(tmp_path / "workspace")) as table:
+        assert table.num_rows == 2
+        assert table.columns == {
+            "smiles": "SMILES",
+            "id": "ID",
+            "activity": "pIC50",
+        }
+        chunk = next(table.iter_compounds())
+        assert sorted(chunk.columns) == ["activity", "id", "smiles"]
+        assert chunk["id"].tolist() == ["1", "2"]
+        key = table.key
+    # Ingesting the same file again reuses the Parquet file
+    with ingest(str(path), str(tmp_path / "workspace")) as table:
+        assert table.key == key
+    assert os.listdir(tmp_path / "workspace") == [f"{key}.parquet"]
+
+
+def test_ingest_csv_falls_back_to_text(tmp_path, monkeypatch):
+    # Types are inferred from the first block only
+    monkeypatch.setattr(ingestion, "CSV_BLOCK_SIZE", 1 << 10)
+    rows = [f"C{'C' * (i % 5)}O,{i}.5" for i in range(500)]
+    rows.append("CCN,not measured")
+    path = tmp_path / "compounds.csv"
+    path.write_text("smiles,pIC50\n" + "\n".join(rows) + "\n")
+    with ingest(str(path), str(tmp_path / "workspace")) as table:
+        assert table.num_rows == 501
+        assert table.file.schema_arrow.field("pIC50").type == pa.string()
+        # A text activity column is not used as activity
+        assert table.columns["activity"] is None
+
+
+def test_ingest_rejects_missing_smiles(tmp_path):
+    path = tmp_path / "compounds.csv"
+    path.write_text("name,pIC50\naspirin,5\n")
+    with pytest.raises(ValueError, match="No SMILES column"):
+        ingest(str(path), str(tmp_path / "workspace"))
+    assert os.listdir(tmp_path / "workspace") == []
+
+
+def test_clean_workspace_keeps_active_sessions(tmp_path):
+    day_ago = os.path.getmtime(tmp_path) - 2 * 24 * 60 * 60
+    for name in ("idle", "active"):
+        (tmp_path / name).mkdir()
+        os.utime(tmp_path / name, (day_ago, day_ago))
+    touch_workspace(str(tmp_path / "active"))
+    clean_workspace(str(tmp_path))
+    assert os.listdir(tmp_path) == ["active"]
@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+
+from scheduler import CPUScheduler
+
+
+def start(target):
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_default_lease_is_a_share_of_the_node():
+    scheduler = CPUScheduler(total_cores=16)
+    assert (scheduler.cores_per_job, scheduler.max_jobs) == (4, 4)
+    scheduler = CPUScheduler(total_cores=2)
+    assert (scheduler.cores_per_job, scheduler.max_jobs) == (1, 2)
+    scheduler = CPUScheduler(total_cores=16, cores_per_job=2)
+    assert (scheduler.cores_per_job, scheduler.max_jobs) == (2, 8)
+
+
+def test_lease_holds_and_returns_cores():
+    scheduler = CPUScheduler(total_cores=4)
+    with scheduler.lease(cores=3, in_process=False) as lease:
+        assert lease.cores == 3
+        assert (scheduler.free_cores, scheduler.running) == (1, 1)
+        assert lease.env()["OMP_NUM_THREADS"] == "3"
+    assert (scheduler.free_cores, scheduler.running) == (4, 0)
+    # A lease larger than the node is capped to the node
+    with scheduler.lease(cores=10, in_process=False) as lease:
+        assert lease.cores == 4
+
+
+def test_cores_are_returned_when_the_job_fails():
+    scheduler = CPUScheduler(total_cores=4)
+    with pytest.raises(RuntimeError):
+        with scheduler.lease(cores=2):
+            raise RuntimeError("job failed")
+    assert (scheduler.free_cores, scheduler.running) == (4, 0)
+
+
+def test_waiters_are_served_in_order():
+    scheduler = CPUScheduler(total_cores=4)
+    order = []
+    release = threading.Event()
+
+    def job(name, cores):
+        def run():
+            with scheduler.lease(cores=cores, in_process=False):
+                order.append(name)
+                release.wait()
+
+        return run
+
+    with scheduler.lease(cores=3, in_process=False):
+        big = start(job("big", 4))
+        wait_until(lambda: scheduler.queued == 1)
+        # One core is free, but the small job must not overtake the big one
+        small = start(job("small", 1))
+        wait_until(lambda: scheduler.queued == 2)
+        assert order == []
+    wait_until(lambda: order == ["big"])
+    release.set()
+    big.join()
+    small.join()
+    assert order == ["big", "small"]
+    assert (scheduler.free_cores, scheduler.queued) == (4, 0)
+
+
+def test_abandoned_ticket_does_not_block_the_queue():
+    class GivingUpCondition(type(threading.Condition())):
+        def wait_for(self, predicate, timeout=None):
+            if threading.current_thread().name == "gives-up":
+                super().wait_for(predicate, timeout=0.1)
+                raise KeyboardInterrupt
+            return super().wait_for(predicate, timeout)
+
+    scheduler = CPUScheduler(total_cores=2)
+    scheduler.condition = GivingUpCondition()
+    errors = []
+    got_lease = threading.Event()
+
+    def gives_up():
+        try:
+            with scheduler.lease(cores=2, in_process=False):
+                pass
+        except KeyboardInterrupt:
+            errors.append("gave up")
+
+    def waits():
+        with scheduler.lease(cores=2, in_process=False):
+            got_lease.set()
+
+    with scheduler.lease(cores=2, in_process=False):
+        first = threading.Thread(target=gives_up, name="gives-up")
+        first.start()
+        wait_until(lambda: scheduler.queued == 1)
+        second = start(waits)
+        first.join()
+        assert errors == ["gave up"]
+        assert scheduler.queued == 1
+    assert got_lease.wait(5)
+    second.join()
+    assert (scheduler.free_cores, scheduler.running) == (2, 0)
+    assert scheduler.queued == 0
+
+
+def test_processes_share_cores_through_slot_files(tmp_path):
+    # Two schedulers stand in for two processes using the same folder
+    first = CPUScheduler(total_cores=2, slots_dir=str(tmp_path))
+    second = CPUScheduler(total_cores=2, slots_dir=str(tmp_path))
+    got_lease = threading.Event()
+
+    def job():
+        with second.lease(cores=2, in_process=False):
+            got_lease.set()
+
+    with first.lease(cores=1, in_process=False):
+        thread = start(job)
+        assert not got_lease.wait(0.5)
+    assert got_lease.wait(5)
+    thread.join()
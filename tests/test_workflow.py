@@ -0,0 +1,104 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app_Compound_Triage.workflow import TRIAGE_STEPS, Workflow
+
+
+def triage_workflow(calls, workspace=None):
+    """The triage DAG with stub steps that record when they run."""
+
+    def step(name):
+        def compute(table, **params):
+            calls.append(name)
+            table = table.copy()
+            table[name] = params.get("value", 1)
+            return table
+
+        compute.__qualname__ = f"compute.{name}"
+        return compute
+
+    workflow = Workflow(max_workers=4, workspace=workspace)
+    workflow.set_input("compounds", pd.DataFrame({"smiles": ["CCO", "CCN"]}))
+    for name, (deps, params) in TRIAGE_STEPS.items():
+        workflow.add_step(name, step(name), deps, **params)
+    return workflow
+
+
+def test_get_computes_only_the_upstream_steps():
+    calls = []
+    workflow = triage_workflow(calls)
+    result = workflow.get("lle_calculator")
+    assert calls == ["smiles_explorer", "logp_calculation", "lle_calculator"]
+    assert result["logp_calculation"].tolist() == [1, 1]
+    workflow.get("lle_calculator")
+    assert len(calls) == 3
+
+
+def test_set_params_invalidates_the_step_and_its_dependents():
+    calls = []
+    workflow = triage_workflow(calls)
+    workflow.get(*TRIAGE_STEPS)
+    workflow.set_params("logp_calculation", value=2)
+    assert [name for name in TRIAGE_STEPS if not workflow.is_cached(name)] == [
+        "logp_calculation",
+        "lle_calculator",
+    ]
+    calls.clear()
+    workflow.get(*TRIAGE_STEPS)
+    assert sorted(calls) == ["lle_calculator", "logp_calculation"]
+    result = workflow.get("lle_calculator")
+    assert result["logp_calculation"].tolist() == [2, 2]
+
+
+def test_set_params_at_the_root_invalidates_every_step():
+    calls = []
+    workflow = triage_workflow(calls)
+    workflow.get(*TRIAGE_STEPS)
+    workflow.set_params("smiles_explorer", value=2)
+    assert not any(workflow.is_cached(name) for name in TRIAGE_STEPS)
+
+
+def test_set_params_replaces_the_parameters():
+    calls = []
+    workflow = triage_workflow(calls)
+    workflow.get("nearest_neighbours")
+    key = workflow.key("nearest_neighbours")
+    workflow.set_params("nearest_neighbours", value=2)
+    workflow.set_params("nearest_neighbours")
+    assert workflow.steps["nearest_neighbours"]["params"] == {}
+    assert workflow.key("nearest_neighbours") == key
+    assert workflow.is_cached("nearest_neighbours")
+
+
+def test_new_input_invalidates_every_step():
+    calls = []
+    workflow = triage_workflow(calls)
+    workflow.get(*TRIAGE_STEPS)
+    workflow.set_input("compounds", pd.DataFrame({"smiles": ["C"]}))
+    assert not any(workflow.is_cached(name) for name in TRIAGE_STEPS)
+
+
+def test_unknown_step():
+    workflow = triage_workflow([])
+    with pytest.raises(KeyError):
+        workflow.get("docking")
+
+
+def test_results_are_saved_in_the_workspace(tmp_path):
+    calls = []
+    workflow = triage_workflow(calls, workspace=str(tmp_path))
+    result = workflow.get("logp_calculation")
+    assert result["logp_calculation"].tolist() == [1, 1]
+    assert sorted(os.listdir(tmp_path)) == [
+        f"logp_calculation-{workflow.key('logp_calculation')}",
+        f"smiles_explorer-{workflow.key('smiles_explorer')}",
+    ]
+    # A recomputed step replaces its old files
+    workflow.set_params("logp_calculation", value=2)
+    result = workflow.get("logp_calculation")
+    assert result["logp_calculation"].tolist() == [2, 2]
+    assert len(os.listdir(tmp_path)) == 2
+    workflow.clear()
+    assert os.listdir(tmp_path) == []
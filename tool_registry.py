@@ -0,0 +1,55 @@
+import importlib
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(ROOT, "menu_config.json")
+
+# Load the menu configuration next to this file, whatever the working directory
+with open(CONFIG_PATH, "r") as f:
+    menu_config = json.load(f)
+
+# Map each tool to a name, using the same names as the Streamlit app
+tools = {}
+for menu in menu_config:
+    if "pages" in menu:
+        for page in menu["pages"]:
+            tools[page["display"].lower().replace(" ", "_")] = page
+    else:
+        tools[menu["folder"]] = menu["page"]
+
+computes = {}
+
+
+def resolve_compute(name):
+    """
+    Return the compute function named by a tool's 'compute' entry
+    ('module:function'), or None if it has none or it cannot be imported.
+
+    A compute function takes a compound table (a DataFrame with a 'smiles'
+    column, one row per input record) plus keyword parameters, and returns the
+    table with its result columns added, one row per input row, in order.
+    """
+    if name in computes:
+        return computes[name]
+    target = tools[name].get("compute")
+    func = None
+    if target:
+        module_name, func_name = target.split(":")
+        try:
+            module = importlib.import_module(module_name)
+            func = getattr(module, func_name, None)
+        except Exception as e:
+            # Report the tool as unavailable rather than failing the listing
+            print(f"Cannot load {target} for {name}: {e}", file=sys.stderr)
+    computes[name] = func
+    return func
+
+
+def is_chunked(name):
+    """
+    Whether a tool works row by row, so a batch can be split into chunks.
+    Tools that compare rows with each other set "chunked": false.
+    """
+    return tools[name].get("chunked", True)